@@ -1,10 +1,16 @@
 import os
 import json
 import io
-import base64
+import functools
+import hashlib
 import logging
-from datetime import datetime, date
-from threading import Lock
+import math
+import atexit
+import sys
+import time
+from contextlib import contextmanager
+from threading import Lock, Thread
+from types import MappingProxyType
 from typing import Optional
 from flask import (
     Flask,
@@ -16,26 +22,127 @@ from flask import (
     current_app,
     send_file,
     make_response,
+    session,
 )
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup, escape
 from flask_wtf import CSRFProtect
 from flask_wtf.csrf import generate_csrf, CSRFError
-from matplotlib.figure import Figure
-from reportlab.pdfgen import canvas as pdf_canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import Table, TableStyle
-from reportlab.lib import colors as rl_colors
+
+try:  # Fast JSON codec (optional); stdlib json used when unavailable
+    import orjson
+except ImportError:  # pragma: no cover (depends on installed wheels)
+    orjson = None
+
+try:  # POSIX advisory file locks (cross-process); absent on Windows
+    import fcntl
+except ImportError:  # pragma: no cover (platform dependent)
+    fcntl = None
+
+try:  # Binary data-file format, used when DATA_FILE ends with .msgpack (optional)
+    import msgpack
+except ImportError:  # pragma: no cover (depends on installed wheels)
+    msgpack = None
+_MSGPACK_ERRORS = (msgpack.UnpackException,) if msgpack is not None else ()
+# Indent data.json/user.json for human inspection (costs bytes and write time)
+_PRETTY_JSON = os.getenv('PRETTY_JSON', 'false').lower() == 'true'
+
+try:  # gzip/brotli response compression (optional); responses sent uncompressed without it
+    from flask_compress import Compress
+except ImportError:  # pragma: no cover (depends on installed wheels)
+    Compress = None
 
 DATA_LOCK = Lock()
-DEFAULT_DATA = {"Warm-up": [], "Workout": [], "Cool-down": []}
+# Category names are interned so lookups with the validated form value hit the identity fast path
+CATEGORIES = tuple(sys.intern(c) for c in ("Warm-up", "Workout", "Cool-down"))
+# Read-only: _load_snapshot hands this out shared; load_data copies before mutation
+DEFAULT_DATA = MappingProxyType({c: () for c in CATEGORIES})
+# <option> list for the /log category <select>; categories are fixed, so build it once
+CATEGORY_OPTIONS = Markup(''.join(f'<option value="{escape(c)}">{escape(c)}</option>' for c in CATEGORIES))
+# DATA_FILE suffix selecting the msgpack on-disk format instead of JSON
+MSGPACK_SUFFIX = '.msgpack'
+# DATA_FILE suffix selecting the append-only JSON Lines log (one entry per line)
+JSONL_SUFFIX = '.jsonl'
+_VALID_CATEGORIES = frozenset(DEFAULT_DATA)
+# Longest single session /log accepts (a full day).
+MAX_DURATION_MINUTES = 1440
 DEFAULT_USER_INFO = {}
 USER_LOCK = Lock()
+# Parsed USER_FILE snapshots: path -> ((st_mtime_ns, st_size), info)
+_USER_CACHE: dict = {}
+# Write-behind queue: DATA_FILE path -> (app, data) awaiting flush, and its flusher thread
+_PENDING: dict = {}
+_FLUSHER: Optional[Thread] = None
+# Parsed DATA_FILE snapshots: path -> ((source, st_mtime_ns, st_size), data, totals, calories)
+_DATA_CACHE: dict = {}
 
 # MET values (approx.) for calorie estimation per category
-MET_VALUES = {
+MET_VALUES = MappingProxyType({
     "Warm-up": 3.0,
     "Workout": 6.0,
     "Cool-down": 2.5,
-}
+})
+
+# Static workout plan shown on /plan
+PLAN_CHART_DATA = MappingProxyType({
+    'Warm-up (5-10 min)': [
+        '5 min light cardio (Jog/Cycle) to raise heart rate.',
+        'Jumping Jacks (30 reps) for dynamic mobility.',
+        'Arm Circles (15 Fwd/Bwd) to prepare shoulders.'
+    ],
+    'Strength & Cardio (45-60 min)': [
+        'Push-ups (3 sets of 10-15) - Upper body strength.',
+        'Squats (3 sets of 15-20) - Lower body foundation.',
+        'Plank (3 sets of 60 seconds) - Core stabilization.',
+        'Lunges (3 sets of 10/leg) - Balance and leg development.'
+    ],
+    'Cool-down (5 min)': [
+        'Slow Walking - Bring heart rate down gradually.',
+        'Static Stretching (Hold 30s each) - Focus on major muscle groups.',
+        'Deep Breathing Exercises - Aid recovery and relaxation.'
+    ]
+})
+
+# Static diet suggestions shown on /diet
+DIET_PLANS = MappingProxyType({
+    '🎯 Weight Loss Focus (Calorie Deficit)': [
+        'Breakfast: Oatmeal with Berries (High Fiber).',
+        'Lunch: Grilled Chicken/Tofu Salad (Lean Protein).',
+        'Dinner: Vegetable Soup with Lentils (Low Calorie, High Volume).'
+    ],
+    '💪 Muscle Gain Focus (High Protein)': [
+        'Breakfast: 3 Egg Omelet, Spinach, Whole-wheat Toast (Protein/Carb combo).',
+        'Lunch: Chicken Breast, Quinoa, and Steamed Veggies (Balanced Meal).',
+        'Post-Workout: Protein Shake & Greek Yogurt (Immediate Recovery).'
+    ],
+    '🏃 Endurance Focus (Complex Carbs)': [
+        'Pre-Workout: Banana & Peanut Butter (Quick Energy).',
+        'Lunch: Whole Grain Pasta with Light Sauce (Sustainable Carbs).',
+        'Dinner: Salmon & Avocado Salad (Omega-3s and Healthy Fats).'
+    ]
+})
+
+# Bar/pie colours shared by the SVG and PNG progress charts (category order)
+_CHART_COLORS = ('#007bff', '#28a745', '#ffc107')
+
+# Single progress-chart Figure reused across requests (Matplotlib artists are not
+# thread-safe, so every redraw happens under _PROG_LOCK). Built on the first PNG
+# render so workers that never serve /progress/chart.png skip importing Matplotlib.
+_PROG_FIG = None
+_PROG_AX1 = None
+_PROG_AX2 = None
+# Pre-sized PNG buffer; overwritten in place (truncate() would release the capacity).
+_PROG_BUF = io.BytesIO(bytes(64 * 1024))
+_PROG_LOCK = Lock()
+
+# str.translate table deleting control characters (U+0000-U+001F, U+007F) from free-text user fields
+_CONTROL_CHARS = dict.fromkeys([*range(0x20), 0x7f])
+# Mifflin-St Jeor BMR constant per gender
+_BMR_OFFSET = MappingProxyType({'M': 5, 'F': -161})
+
+# Last formatted log timestamp: [epoch_second, text]
+_TS_CACHE = [0, '']
 
 # Cache a single SECRET_KEY value so all Gunicorn workers share it.
 _GLOBAL_SECRET: Optional[str] = None
@@ -45,46 +152,300 @@ _GLOBAL_SECRET: Optional[str] = None
 logger = logging.getLogger(__name__)
 
 
-def load_data():
-    """Load workout data from the configured DATA_FILE."""
+def _json_loads(raw: bytes):
+    """Decode a JSON document from bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(obj) -> bytes:
+    """Encode obj as compact UTF-8 JSON (orjson when available); indented if PRETTY_JSON."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if _PRETTY_JSON else 0)
+    if _PRETTY_JSON:
+        return json.dumps(obj, indent=2).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+if orjson is not None:
+    class _OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider (jsonify/tojson) backed by orjson.
+
+        Dates, dataclasses and other non-native types are passed through to
+        Flask's ``default`` hook so the output matches the stdlib provider.
+        """
+        _OPTIONS = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+
+        def _encode(self, obj, sort_keys: bool, indent: bool = False) -> bytes:
+            option = self._OPTIONS
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option)
+
+        def dumps(self, obj, **kwargs) -> str:
+            # tojson always passes sort_keys; orjson covers that one itself.
+            sort_keys = kwargs.pop('sort_keys', self.sort_keys)
+            if kwargs:  # other json.dumps arguments; let the stdlib honour them
+                return super().dumps(obj, sort_keys=sort_keys, **kwargs)
+            return self._encode(obj, sort_keys).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            if kwargs:
+                return super().loads(s, **kwargs)
+            return orjson.loads(s)
+
+        def response(self, *args, **kwargs):
+            # Flask's version always passes separators=/indent= to dumps(), which would
+            # route every jsonify() through the stdlib fallback. Mirrors Flask 2.3.3 (the
+            # pinned version), including the private _prepare_response_obj and the
+            # compact/debug indent rule; re-check both when bumping Flask.
+            obj = self._prepare_response_obj(args, kwargs)
+            indent = (self.compact is None and self._app.debug) or self.compact is False
+            body = self._encode(obj, self.sort_keys, indent) + b'\n'
+            return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def _is_msgpack(path: str) -> bool:
+    return path.endswith(MSGPACK_SUFFIX)
+
+
+def _is_jsonl(path: str) -> bool:
+    return path.endswith(JSONL_SUFFIX)
+
+
+def _json_line(category: str, entry: dict) -> bytes:
+    """One compact JSONL record: the entry tagged with its category under 'cat'."""
+    record = {'cat': category, **entry}
+    if orjson is not None:
+        return orjson.dumps(record) + b'\n'
+    return json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def _decode_jsonl(raw: bytes) -> dict:
+    """Group JSONL records back into the category -> sessions document.
+
+    A line that fails to parse (e.g. torn by a crash mid-append) or is not a
+    ``{"cat": ...}`` record (e.g. hand-edited) is skipped rather than
+    discarding the whole history.
+    """
+    data = {c: [] for c in CATEGORIES}
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = _json_loads(line)
+        except ValueError:
+            logger.warning('Skipping unreadable JSONL record in workout log.')
+            continue
+        if not isinstance(entry, dict) or not isinstance(entry.get('cat'), str):
+            logger.warning('Skipping JSONL record without a category in workout log.')
+            continue
+        data.setdefault(entry.pop('cat'), []).append(entry)
+    return data
+
+
+def _decode_data(path: str, raw: bytes) -> dict:
+    """Decode a workout document; format chosen by file extension."""
+    if _is_msgpack(path):
+        return msgpack.unpackb(raw)
+    if _is_jsonl(path):
+        return _decode_jsonl(raw)
+    return _json_loads(raw)
+
+
+def _encode_data(path: str, data: dict) -> bytes:
+    """Encode a workout document; format chosen by file extension."""
+    if _is_msgpack(path):
+        return msgpack.packb(data)
+    if _is_jsonl(path):
+        return b''.join(_json_line(cat, e) for cat, sessions in data.items() for e in sessions)
+    return _json_dumps(data)
+
+
+def _stat_data_source(data_file: str):
+    """Return (path, stat) of the file holding workout data, or (None, None).
+
+    A missing .msgpack or .jsonl file falls back to its legacy .json sibling,
+    so switching DATA_FILE format migrates on the first save.
+    """
+    candidates = [data_file]
+    if _is_msgpack(data_file) or _is_jsonl(data_file):
+        candidates.append(os.path.splitext(data_file)[0] + '.json')
+    for path in candidates:
+        try:
+            return path, os.stat(path)
+        except OSError:
+            continue
+    return None, None
+
+
+def _data_stamp(data_file: str):
+    """Cache validator for DATA_FILE: (source, mtime_ns, size), or None if absent."""
+    source, st = _stat_data_source(data_file)
+    if source is None:
+        return None
+    return (source, st.st_mtime_ns, st.st_size)
+
+
+def _copy_data(data: dict) -> dict:
+    """Copy the category -> sessions mapping so callers may append freely.
+
+    Session dicts themselves are shared; nothing mutates them after logging.
+    """
+    return {k: list(v) for k, v in data.items()}
+
+
+def _aggregate(data: dict) -> tuple:
+    """Per-category minutes and overall calories for a workout document, in one pass."""
+    totals = {}
+    calories = 0
+    for cat, sessions in data.items():
+        minutes = 0
+        for e in sessions:
+            minutes += e['duration']
+            calories += e.get('calories', 0)
+        totals[cat] = minutes
+    return totals, calories
+
+
+def _snapshot_entry(stamp, data: dict) -> tuple:
+    """Build a ``_DATA_CACHE`` value: the document plus its minute and calorie aggregates."""
+    return (stamp, data, *_aggregate(data))
+
+
+def _load_snapshot() -> tuple:
+    """Return the cached ``(data, totals, calories)`` triple for DATA_FILE (read-only!).
+
+    The parsed document, its per-category minute totals and the overall
+    calorie total are cached per path and reused while the file's
+    (path, mtime_ns, size) stamp is unchanged, so read-only routes skip both
+    the decode and the O(N) aggregations.
+    """
     data_file = current_app.config['DATA_FILE']
-    if not os.path.exists(data_file):
-        return DEFAULT_DATA.copy()
+    stamp = _data_stamp(data_file)
+    cached = _DATA_CACHE.get(data_file)
+    if cached and cached[0] == stamp:
+        return cached[1:]
+    if stamp is None:
+        return (DEFAULT_DATA, *_aggregate(DEFAULT_DATA))
+    source = stamp[0]
     try:
-        with open(data_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(source, "rb") as f:
+            # Stamp from the open descriptor so the cache key matches the bytes read
+            # even if the file was replaced after the stat above.
+            st = os.fstat(f.fileno())
+            stamp = (source, st.st_mtime_ns, st.st_size)
+            data = _decode_data(source, f.read())
         # Backward compatibility: ensure required keys
         for k in DEFAULT_DATA.keys():
             data.setdefault(k, [])
-        return data
-    except (json.JSONDecodeError, OSError):
-        return DEFAULT_DATA.copy()
+    except (ValueError, OSError) + _MSGPACK_ERRORS:
+        return (DEFAULT_DATA, *_aggregate(DEFAULT_DATA))
+    entry = _DATA_CACHE[data_file] = _snapshot_entry(stamp, data)
+    return entry[1:]
+
+
+def load_data():
+    """Load workout data from the configured DATA_FILE (safe to mutate)."""
+    return _copy_data(_load_snapshot()[0])
 
 
 def load_user_info() -> dict:
-    """Load persisted user information (if any)."""
+    """Load persisted user information (if any), cached like load_data()."""
     path = current_app.config['USER_FILE']
-    if not os.path.exists(path):
+    try:
+        st = os.stat(path)
+    except OSError:
         return DEFAULT_USER_INFO.copy()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _USER_CACHE.get(path)
+    if cached and cached[0] == stamp:
+        return dict(cached[1])
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            info = json.load(f)
-        return info
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            stamp = (st.st_mtime_ns, st.st_size)
+            info = _json_loads(f.read())
     except (json.JSONDecodeError, OSError):  # pragma: no cover (I/O failure)
         return DEFAULT_USER_INFO.copy()
+    _USER_CACHE[path] = (stamp, info)
+    return dict(info)
+
+
+def _fsync_dir(path: str) -> None:
+    """fsync the directory containing path so a preceding rename is durable.
+
+    No-op where directories cannot be opened (e.g. Windows).
+    """
+    if not hasattr(os, 'O_DIRECTORY'):  # pragma: no cover (platform dependent)
+        return
+    dir_fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _atomic_write(path: str, tmp_path: str, payload: bytes) -> None:
+    """Write payload to tmp_path with raw fd writes, fsync, then rename over path."""
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive advisory lock on ``path + '.lock'`` shared by all worker processes.
+
+    DATA_LOCK only serialises threads inside one Gunicorn worker; this stops two
+    workers from interleaving load -> append -> save and losing an entry.
+    """
+    if fcntl is None:  # pragma: no cover (platform dependent)
+        yield
+        return
+    try:
+        fd = os.open(path + '.lock', os.O_CREAT | os.O_RDWR, 0o666)
+    except OSError as e:  # pragma: no cover (read-only directory; save_data reports the failure)
+        logger.warning(f"Unable to open lock file for '{path}': {e}")
+        yield
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
 
 
 def save_data(data):
-    """Atomically persist workout data to configured DATA_FILE.
+    """Atomically and durably persist workout data to configured DATA_FILE.
+
+    The temp file is fsynced before the rename and the directory after it,
+    so a crash leaves either the old or the new document, never an empty one.
 
     Returns True on success, False if an OS error occurs (logged).
     """
     data_file = current_app.config['DATA_FILE']
     tmp_file = data_file + ".tmp"
     try:
-        with open(tmp_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        os.replace(tmp_file, data_file)
+        _atomic_write(data_file, tmp_file, _encode_data(data_file, data))
+        # Prime the cache with what we just wrote so the next reader skips the parse.
+        st = os.stat(data_file)
+        snapshot = _copy_data(data)
+        _DATA_CACHE[data_file] = _snapshot_entry((data_file, st.st_mtime_ns, st.st_size), snapshot)
         return True
     except OSError as e:  # pragma: no cover (hard to simulate in tests reliably)
         current_app.logger.error(f"Failed to write data file '{data_file}': {e}")
@@ -96,14 +457,93 @@ def save_data(data):
         return False
 
 
+def append_entry(category: str, entry: dict) -> bool:
+    """Append one workout to a .jsonl DATA_FILE without rewriting the history.
+
+    Caller holds DATA_LOCK and the file lock. A missing file (or a legacy .json
+    sibling still being read) is written in full once via save_data(); after
+    that each log is a single O_APPEND write + fsync. Returns False on OS error.
+    """
+    data_file = current_app.config['DATA_FILE']
+    if _stat_data_source(data_file)[0] != data_file:
+        data = load_data()
+        data.setdefault(category, []).append(entry)
+        return save_data(data)
+    try:
+        fd = os.open(data_file, os.O_RDWR | os.O_APPEND)
+        try:
+            before = os.fstat(fd)
+            line = _json_line(category, entry)
+            if before.st_size and os.pread(fd, 1, before.st_size - 1) != b'\n':
+                line = b'\n' + line  # terminate a torn record so this one stays parseable
+            view = memoryview(line)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+            after = os.fstat(fd)
+        finally:
+            os.close(fd)
+    except OSError as e:  # pragma: no cover (hard to simulate in tests reliably)
+        current_app.logger.error(f"Failed to append to data file '{data_file}': {e}")
+        return False
+    # Extend a cached snapshot of the pre-append file instead of re-parsing the log.
+    cached = _DATA_CACHE.get(data_file)
+    if cached and cached[0] == (data_file, before.st_mtime_ns, before.st_size):
+        snapshot = _copy_data(cached[1])
+        snapshot.setdefault(category, []).append(entry)
+        _DATA_CACHE[data_file] = _snapshot_entry((data_file, after.st_mtime_ns, after.st_size), snapshot)
+    return True
+
+
+def _flush_pending() -> None:
+    """Persist every write-behind document still waiting (flusher thread + atexit)."""
+    with DATA_LOCK:
+        pending = list(_PENDING.items())
+        _PENDING.clear()
+        for data_file, (app, data) in pending:
+            with app.app_context(), _file_lock(data_file):
+                if not save_data(data):  # pragma: no cover (I/O failure) - retry next round
+                    _PENDING.setdefault(data_file, (app, data))
+
+
+atexit.register(_flush_pending)
+
+
+def _flush_loop(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        _flush_pending()
+
+
+def queue_save_data(data) -> bool:
+    """Write-behind variant of save_data (DATA_WRITE_BEHIND > 0); caller holds DATA_LOCK.
+
+    The document becomes the cached snapshot immediately, so this worker's
+    readers see it, and a daemon thread writes it out within the interval.
+    Only safe with a single worker process (create_app insists on WEB_CONCURRENCY=1):
+    a flush rewrites the whole file from this worker's copy.
+    """
+    global _FLUSHER
+    app = current_app._get_current_object()
+    data_file = app.config['DATA_FILE']
+    snapshot = _copy_data(data)
+    # Keep the on-disk stamp so the cache stays valid until the flush rewrites the file.
+    _DATA_CACHE[data_file] = _snapshot_entry(_data_stamp(data_file), snapshot)
+    _PENDING[data_file] = (app, snapshot)
+    if _FLUSHER is None or not _FLUSHER.is_alive():
+        _FLUSHER = Thread(target=_flush_loop, args=(app.config['DATA_WRITE_BEHIND'],), daemon=True)
+        _FLUSHER.start()
+    return True
+
+
 def save_user_info(info: dict) -> bool:
-    """Persist user info to USER_FILE (simple overwrite)."""
+    """Atomically and durably persist user info to USER_FILE."""
     path = current_app.config['USER_FILE']
     tmp = path + '.tmp'
     try:
-        with open(tmp, 'w', encoding='utf-8') as f:
-            json.dump(info, f, indent=2)
-        os.replace(tmp, path)
+        _atomic_write(path, tmp, _json_dumps(info))
+        st = os.stat(path)
+        _USER_CACHE[path] = ((st.st_mtime_ns, st.st_size), dict(info))
         return True
     except OSError as e:  # pragma: no cover
         current_app.logger.error(f"Failed to write user file '{path}': {e}")
@@ -143,15 +583,16 @@ def _get_global_secret(test_config: Optional[dict], testing: bool) -> str:
     return _GLOBAL_SECRET
 
 
+def _clean_text(s: str) -> str:
+    return s.strip().translate(_CONTROL_CHARS)
+
 def _validate_user_form(form) -> tuple[list, dict]:
     """Validate and sanitize user form input; returns (errors, cleaned_data)."""
-    import re
     errors: list[str] = []
-    cleaner = lambda s: re.sub(r'[\x00-\x1f\x7f]', '', s.strip())
-    name = cleaner(form.get('name', ''))
-    regn_id = cleaner(form.get('regn_id', ''))
+    name = _clean_text(form.get('name', ''))
+    regn_id = _clean_text(form.get('regn_id', ''))
     age_str = form.get('age', '').strip()
-    gender = cleaner(form.get('gender', '')).upper()
+    gender = _clean_text(form.get('gender', '')).upper()
     height_str = form.get('height', '').strip()
     weight_str = form.get('weight', '').strip()
     try:
@@ -169,7 +610,7 @@ def _validate_user_form(form) -> tuple[list, dict]:
         height_cm = 0.0
         weight_kg = 0.0
         age = 0
-    if gender not in {'M','F'}:
+    if gender not in _BMR_OFFSET:
         errors.append('Gender must be M or F.')
     if len(name) > 100:
         errors.append('Name too long (>100).')
@@ -178,10 +619,7 @@ def _validate_user_form(form) -> tuple[list, dict]:
     if errors:
         return errors, {}
     bmi = weight_kg / ((height_cm/100)**2)
-    if gender == 'M':
-        bmr = 10*weight_kg + 6.25*height_cm - 5*age + 5
-    else:
-        bmr = 10*weight_kg + 6.25*height_cm - 5*age - 161
+    bmr = 10*weight_kg + 6.25*height_cm - 5*age + _BMR_OFFSET[gender]
     return errors, {
         'name': name,
         'regn_id': regn_id,
@@ -194,16 +632,23 @@ def _validate_user_form(form) -> tuple[list, dict]:
         'weekly_cal_goal': 2000,
     }
 
+def _now_timestamp() -> str:
+    """Local 'YYYY-MM-DD HH:MM:SS' string, formatted at most once per second."""
+    now = int(time.time())
+    cached = _TS_CACHE
+    if cached[0] != now:
+        # Single slice assignment keeps the (second, text) pair consistent across threads.
+        cached[:] = [now, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))]
+    return cached[1]
+
 def _calc_calories(category: str, duration: int, user: dict) -> float:
     weight = user.get('weight', 70)
     met = MET_VALUES.get(category, 5.0)
     return (met * 3.5 * weight / 200.0) * duration
 
 def index():
-    data = load_data()
-    categories = list(data.keys())
     user = load_user_info()
-    return render_template('index.html', categories=categories, user=user)
+    return render_template('index.html', category_options=CATEGORY_OPTIONS, user=user)
 
 def user_info():
     user = load_user_info()
@@ -222,109 +667,224 @@ def user_save():
     return redirect(url_for('user_info'))
 
 def log_workout():
-    data = load_data()
-    user = load_user_info()
     category = request.form.get('category', 'Workout')
     exercise = request.form.get('exercise', '').strip()
     duration_str = request.form.get('duration', '').strip()
     if not exercise or not duration_str:
         flash('Please provide both exercise and duration.', 'error')
         return redirect(url_for('index'))
-    try:
-        duration = int(duration_str)
-        if duration <= 0:
-            raise ValueError
-    except ValueError:
+    if len(exercise) > 100:
+        flash('Exercise name too long (>100).', 'error')
+        return redirect(url_for('index'))
+    # Pre-validate instead of catching ValueError: bad input is the common failure.
+    if not (duration_str.isascii() and duration_str.isdigit()) or not duration_str.strip('0'):
         flash('Duration must be a positive whole number.', 'error')
         return redirect(url_for('index'))
-    if category not in data:
+    # Length check first, so int() never has to convert a huge digit string.
+    if len(duration_str.lstrip('0')) > len(str(MAX_DURATION_MINUTES)) or int(duration_str) > MAX_DURATION_MINUTES:
+        flash(f'Duration too large (max {MAX_DURATION_MINUTES} minutes).', 'error')
+        return redirect(url_for('index'))
+    duration = int(duration_str)
+    if category not in _VALID_CATEGORIES:
         flash('Invalid category selected.', 'error')
         return redirect(url_for('index'))
+    category = sys.intern(category)
+    user = load_user_info()
     calories = _calc_calories(category, duration, user)
+    timestamp = _now_timestamp()
     entry = {
         'exercise': exercise,
         'duration': duration,
         'calories': calories,
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'date': date.today().isoformat(),
+        'timestamp': timestamp,
+        'date': timestamp[:10],
     }
-    with DATA_LOCK:
-        data[category].append(entry)
-        if not save_data(data):
-            flash('Failed to persist workout data (server filesystem issue).', 'error')
-            return redirect(url_for('index'))
+    data_file = current_app.config['DATA_FILE']
+    persist = queue_save_data if current_app.config['DATA_WRITE_BEHIND'] > 0 else save_data
+    with DATA_LOCK, _file_lock(data_file):
+        if _is_jsonl(data_file):
+            saved = append_entry(category, entry)
+        else:
+            # Re-read under the lock so writes from other workers are not overwritten.
+            data = load_data()
+            data[category].append(entry)
+            saved = persist(data)
+    if not saved:
+        flash('Failed to persist workout data (server filesystem issue).', 'error')
+        return redirect(url_for('index'))
     flash(f'Added {exercise} ({duration} min) to {category}!', 'success')
     return redirect(url_for('index'))
 
 def summary():
-    data = load_data()
-    total_time = sum(e['duration'] for sessions in data.values() for e in sessions)
-    total_calories = sum(e.get('calories', 0) for sessions in data.values() for e in sessions)
-    return render_template('summary.html', data=data, total_time=total_time, total_calories=total_calories)
+    data, totals, total_calories = _load_snapshot()
+    total_time = sum(totals.values())
+    # Render one page of the newest sessions per category (?page=2 is older);
+    # the totals above still cover the whole history.
+    size = current_app.config['SUMMARY_PAGE_SIZE']
+    longest = max(map(len, data.values()), default=0)
+    pages = max(1, -(-longest // size))
+    page = min(max(request.args.get('page', 1, type=int), 1), pages)
+    shown, starts = {}, {}
+    for cat, sessions in data.items():
+        stop = max(len(sessions) - (page - 1) * size, 0)
+        start = max(stop - size, 0)
+        shown[cat] = sessions[start:stop]
+        starts[cat] = start + 1
+    return render_template(
+        'summary.html',
+        data=shown,
+        starts=starts,
+        page=page,
+        pages=pages,
+        total_time=total_time,
+        total_calories=total_calories,
+    )
+
+def _prerender_static_pages(app: Flask) -> None:
+    """Render the constant /plan and /diet pages once; keep body + ETag per app."""
+    pages = {}
+    with app.test_request_context():
+        for endpoint, template, context in (
+            ('plan', 'plan.html', {'chart_data': PLAN_CHART_DATA}),
+            ('diet', 'diet.html', {'diet_plans': DIET_PLANS}),
+        ):
+            body = render_template(template, **context).encode('utf-8')
+            pages[endpoint] = (body, hashlib.sha1(body).hexdigest())
+    app.extensions['static_pages'] = pages
+
+def _matching_etag(etag: str) -> Optional[str]:
+    """Return the If-None-Match tag naming ``etag``, or None.
+
+    Flask-Compress sends compressed bodies out as ``"<etag>:gzip"`` /
+    ``"<etag>:br"``, and browsers revalidate with that form, so a tag matches
+    with or without a ``:<algorithm>`` suffix.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return etag
+    for tag in if_none_match.as_set():
+        if tag.split(':', 1)[0] == etag:
+            return tag
+    return None
+
+def _not_modified(tag: str):
+    resp = make_response('', 304)
+    resp.set_etag(tag)
+    return resp
+
+def _static_page_response(endpoint: str):
+    """Fresh Response around a pre-rendered page (never share Response objects:
+    session handling may attach per-user cookies)."""
+    body, etag = current_app.extensions['static_pages'][endpoint]
+    matched = _matching_etag(etag)
+    if matched is not None:
+        resp = _not_modified(matched)
+        resp.headers['Cache-Control'] = 'private, max-age=3600'
+        return resp
+    resp = make_response(body)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, max-age=3600'
+    return resp
 
 def plan():
-    chart_data = {
-        'Warm-up (5-10 min)': [
-            '5 min light cardio (Jog/Cycle) to raise heart rate.',
-            'Jumping Jacks (30 reps) for dynamic mobility.',
-            'Arm Circles (15 Fwd/Bwd) to prepare shoulders.'
-        ],
-        'Strength & Cardio (45-60 min)': [
-            'Push-ups (3 sets of 10-15) - Upper body strength.',
-            'Squats (3 sets of 15-20) - Lower body foundation.',
-            'Plank (3 sets of 60 seconds) - Core stabilization.',
-            'Lunges (3 sets of 10/leg) - Balance and leg development.'
-        ],
-        'Cool-down (5 min)': [
-            'Slow Walking - Bring heart rate down gradually.',
-            'Static Stretching (Hold 30s each) - Focus on major muscle groups.',
-            'Deep Breathing Exercises - Aid recovery and relaxation.'
-        ]
-    }
-    return render_template('plan.html', chart_data=chart_data)
+    return _static_page_response('plan')
 
 def diet():
-    diet_plans = {
-        '🎯 Weight Loss Focus (Calorie Deficit)': [
-            'Breakfast: Oatmeal with Berries (High Fiber).',
-            'Lunch: Grilled Chicken/Tofu Salad (Lean Protein).',
-            'Dinner: Vegetable Soup with Lentils (Low Calorie, High Volume).'
-        ],
-        '💪 Muscle Gain Focus (High Protein)': [
-            'Breakfast: 3 Egg Omelet, Spinach, Whole-wheat Toast (Protein/Carb combo).',
-            'Lunch: Chicken Breast, Quinoa, and Steamed Veggies (Balanced Meal).',
-            'Post-Workout: Protein Shake & Greek Yogurt (Immediate Recovery).'
-        ],
-        '🏃 Endurance Focus (Complex Carbs)': [
-            'Pre-Workout: Banana & Peanut Butter (Quick Energy).',
-            'Lunch: Whole Grain Pasta with Light Sauce (Sustainable Carbs).',
-            'Dinner: Salmon & Avocado Salad (Omega-3s and Healthy Fats).'
-        ]
-    }
-    return render_template('diet.html', diet_plans=diet_plans)
+    return _static_page_response('diet')
 
-def progress():
-    data = load_data()
-    totals = {cat: sum(e['duration'] for e in sessions) for cat, sessions in data.items()}
-    total_minutes = sum(totals.values())
-    total_calories = sum(e.get('calories', 0) for sessions in data.values() for e in sessions)
-    chart_img = None
-    if total_minutes > 0:
-        fig = Figure(figsize=(7.5, 4.5), dpi=100, facecolor='white')
-        colors = ['#007bff', '#28a745', '#ffc107']
-        ax1 = fig.add_subplot(121)
-        categories = list(totals.keys())
-        values = list(totals.values())
+@functools.lru_cache(maxsize=64)
+def _render_progress_svg(totals_items: tuple) -> Markup:
+    """Render the bar + pie progress chart as inline SVG markup.
+
+    A handful of <rect>/<path> elements is all the three-category chart
+    needs, so the default /progress view never touches Matplotlib.
+    """
+    width, height = 750, 450
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+        'class="chart-img" role="img" aria-label="Progress Charts" font-family="sans-serif">',
+        '<rect width="100%" height="100%" fill="white"/>',
+    ]
+    # Bar chart (left half)
+    plot_x, plot_y, plot_w, plot_h = 60, 50, 290, 330
+    peak = max(v for _, v in totals_items) or 1
+    slot = plot_w / len(totals_items)
+    parts.append(f'<text x="{plot_x + plot_w / 2:.1f}" y="30" font-size="14" text-anchor="middle">Time Spent per Category (Min)</text>')
+    parts.append(f'<rect x="{plot_x}" y="{plot_y}" width="{plot_w}" height="{plot_h}" fill="none" stroke="black"/>')
+    for i, (cat, val) in enumerate(totals_items):
+        bar_h = plot_h * val / peak
+        center = plot_x + slot * (i + 0.5)
+        top = plot_y + plot_h - bar_h
+        parts.append(
+            f'<rect x="{center - slot * 0.4:.1f}" y="{top:.1f}" width="{slot * 0.8:.1f}" '
+            f'height="{bar_h:.1f}" fill="{_CHART_COLORS[i % len(_CHART_COLORS)]}"/>'
+        )
+        parts.append(f'<text x="{center:.1f}" y="{top - 4:.1f}" font-size="11" text-anchor="middle">{val}</text>')
+        parts.append(f'<text x="{center:.1f}" y="{plot_y + plot_h + 18}" font-size="11" text-anchor="middle">{escape(cat)}</text>')
+    # Pie chart (right half), first slice starting at 12 o'clock
+    cx, cy, r = 560, 230, 140
+    parts.append(f'<text x="{cx}" y="30" font-size="14" text-anchor="middle">Workout Distribution</text>')
+    total = sum(v for _, v in totals_items)
+    angle = -math.pi / 2
+    for i, (cat, val) in enumerate(totals_items):
+        if val <= 0:
+            continue
+        frac = val / total
+        color = _CHART_COLORS[i % len(_CHART_COLORS)]
+        if frac >= 1:
+            parts.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{color}" stroke="black" stroke-width="0.5"/>')
+        else:
+            end = angle + 2 * math.pi * frac
+            x0, y0 = cx + r * math.cos(angle), cy + r * math.sin(angle)
+            x1, y1 = cx + r * math.cos(end), cy + r * math.sin(end)
+            large = 1 if frac > 0.5 else 0
+            parts.append(
+                f'<path d="M{cx},{cy} L{x0:.2f},{y0:.2f} A{r},{r} 0 {large} 1 {x1:.2f},{y1:.2f} Z" '
+                f'fill="{color}" stroke="black" stroke-width="0.5"/>'
+            )
+        mid = angle + math.pi * frac
+        cos_m, sin_m = math.cos(mid), math.sin(mid)
+        parts.append(f'<text x="{cx + r * 0.6 * cos_m:.1f}" y="{cy + r * 0.6 * sin_m:.1f}" font-size="11" text-anchor="middle">{frac * 100:.1f}%</text>')
+        anchor = 'start' if cos_m >= 0 else 'end'
+        parts.append(f'<text x="{cx + r * 1.1 * cos_m:.1f}" y="{cy + r * 1.1 * sin_m:.1f}" font-size="11" text-anchor="{anchor}">{escape(cat)}</text>')
+        angle += 2 * math.pi * frac
+    parts.append('</svg>')
+    return Markup(''.join(parts))
+
+def _ensure_progress_figure() -> None:
+    """Create the shared progress Figure on first use (caller holds _PROG_LOCK)."""
+    global _PROG_FIG, _PROG_AX1, _PROG_AX2
+    if _PROG_FIG is None:
+        from matplotlib.figure import Figure
+        _PROG_FIG = Figure(figsize=(7.5, 4.5), dpi=100, facecolor='white')
+        _PROG_AX1 = _PROG_FIG.add_subplot(121)
+        _PROG_AX2 = _PROG_FIG.add_subplot(122)
+
+@functools.lru_cache(maxsize=64)
+def _render_progress_png(totals_items: tuple) -> bytes:
+    """Render the bar + pie progress chart and return the PNG bytes.
+
+    Keyed on the ``(category, minutes)`` pairs so repeat views with unchanged
+    totals skip the Matplotlib draw and PNG encode entirely.
+    """
+    colors = [_CHART_COLORS[i % len(_CHART_COLORS)] for i in range(len(totals_items))]
+    categories = [c for c, _ in totals_items]
+    values = [v for _, v in totals_items]
+    # One pass keeps each pie label, value and colour together; empty categories drop out.
+    pie_labels, pie_values, pie_colors = map(list, zip(*(
+        (c, v, color) for (c, v), color in zip(totals_items, colors) if v > 0
+    )))
+    with _PROG_LOCK:
+        _ensure_progress_figure()
+        ax1, ax2 = _PROG_AX1, _PROG_AX2
+        ax1.clear()
+        ax2.clear()
         ax1.bar(categories, values, color=colors)
         ax1.set_title('Time Spent per Category (Min)', fontsize=10)
         ax1.set_ylabel('Total Minutes', fontsize=8)
         ax1.tick_params(axis='x', labelsize=8)
         ax1.tick_params(axis='y', labelsize=8)
         ax1.grid(axis='y', linestyle='--', alpha=0.7)
-        ax2 = fig.add_subplot(122)
-        pie_labels = [c for c, v in totals.items() if v > 0]
-        pie_values = [v for v in totals.values() if v > 0]
-        pie_colors = [colors[i] for i, v in enumerate(values) if v > 0]
         ax2.pie(
             pie_values,
             labels=pie_labels,
@@ -336,20 +896,100 @@ def progress():
         )
         ax2.set_title('Workout Distribution', fontsize=10)
         ax2.axis('equal')
-        fig.tight_layout(pad=2.0)
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png')
+        _PROG_FIG.tight_layout(pad=2.0)
+        buf = _PROG_BUF
         buf.seek(0)
-        chart_img = base64.b64encode(buf.read()).decode('utf-8')
-    return render_template('progress.html', totals=totals, total_minutes=total_minutes, total_calories=total_calories, chart_img=chart_img)
+        # Fast zlib level, no optimize pass: the chart is mostly flat colour regions.
+        _PROG_FIG.savefig(buf, format='png', pil_kwargs={'compress_level': 3, 'optimize': False})
+        size = buf.tell()
+        with buf.getbuffer() as view, view[:size] as png:
+            return bytes(png)
 
-def export_pdf():
-    user = load_user_info()
-    data = load_data()
-    filename = 'weekly_report.pdf'
-    tmp_path = os.path.join(current_app.instance_path, filename)
-    os.makedirs(current_app.instance_path, exist_ok=True)
-    c = pdf_canvas.Canvas(tmp_path, pagesize=A4)
+def _templates_version(env) -> str:
+    """Hash of every template source; computed once per app, since templates only
+    change with a restart outside debug (auto_reload is off)."""
+    digest = hashlib.sha1()
+    for name in sorted(env.list_templates(extensions=('html',))):
+        digest.update(name.encode('utf-8'))
+        digest.update(env.loader.get_source(env, name)[0].encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+def progress():
+    _, totals, total_calories = _load_snapshot()
+    total_minutes = sum(totals.values())
+    chart_svg = None
+    # Inline SVG by default; ?format=png points the page at the raster chart route instead.
+    chart_png = request.args.get('format') == 'png'
+    # The page is a pure function of the aggregates and its templates/stylesheet (so a
+    # deploy invalidates it too), so they make the validator. Pending flash messages
+    # must be rendered (and consumed), so those responses skip the ETag.
+    etag = None
+    if '_flashes' not in session:
+        page_version = (
+            current_app.extensions['templates_version'],
+            _static_version(current_app.static_folder, 'style.css'),
+        )
+        key = (tuple(totals.items()), total_calories, chart_png, page_version)
+        etag = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        matched = _matching_etag(etag)
+        if matched is not None:
+            resp = _not_modified(matched)
+            resp.headers['Cache-Control'] = 'private, max-age=0, must-revalidate'
+            return resp
+    if total_minutes > 0 and not chart_png:
+        chart_svg = _render_progress_svg(tuple(totals.items()))
+    resp = make_response(render_template(
+        'progress.html',
+        totals=totals,
+        total_minutes=total_minutes,
+        total_calories=total_calories,
+        chart_svg=chart_svg,
+    ))
+    if etag is not None:
+        resp.set_etag(etag)
+        resp.headers['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return resp
+
+def progress_chart():
+    """Serve the Matplotlib progress chart as a raw PNG with ETag revalidation."""
+    _, totals, _ = _load_snapshot()
+    if sum(totals.values()) <= 0:
+        return 'No workout data logged yet.', 404
+    totals_items = tuple(totals.items())
+    etag = hashlib.sha1(repr(totals_items).encode('utf-8')).hexdigest()
+    if request.if_none_match.contains(etag):
+        resp = make_response('', 304)
+    else:
+        resp = make_response(_render_progress_png(totals_items))
+        resp.mimetype = 'image/png'
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    return resp
+
+@functools.lru_cache(maxsize=1)
+def _report_table_style():
+    """Weekly-report table style, parsed once on the first export rather than per request."""
+    from reportlab.platypus import TableStyle
+    from reportlab.lib import colors as rl_colors
+    return TableStyle([
+        ("BACKGROUND", (0,0), (-1,0), rl_colors.lightblue),
+        ("GRID", (0,0), (-1,-1), 0.5, rl_colors.black),
+        ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
+    ])
+
+def _build_report_pdf(user: dict, data) -> io.BytesIO:
+    """Render the weekly report for ``user``/``data`` into an in-memory PDF.
+
+    Takes plain values rather than reading request state, so it is safe to
+    call from any thread.
+    """
+    # ReportLab is imported on the first export so other routes and worker boot skip it.
+    from reportlab.pdfgen import canvas as pdf_canvas
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import Table
+    # Build in memory: no disk round-trip, and concurrent exports can't clobber a shared file.
+    buf = io.BytesIO()
+    c = pdf_canvas.Canvas(buf, pagesize=A4)
     width, height = A4
     c.setFont('Helvetica-Bold', 16)
     c.drawString(50, height - 50, f"Weekly Fitness Report - {user.get('name', 'Anonymous')}")
@@ -368,21 +1008,14 @@ def export_pdf():
         c.drawString(50, base_y - i * line_gap, line)
     y = base_y - (len(user_lines) * line_gap) - 40
     table_data = [["Category", "Exercise", "Duration", "Calories", "Date"]]
-    for cat, sessions in data.items():
-        for e in sessions:
-            table_data.append([
-                cat,
-                e.get('exercise',''),
-                f"{e.get('duration',0)} min",
-                f"{e.get('calories',0):.1f}",
-                e.get('timestamp','').split(' ')[0],
-            ])
+    # exercise/duration are always written by log_workout; calories may be absent in old files.
+    table_data.extend(
+        [cat, e['exercise'], f"{e['duration']} min", f"{e.get('calories', 0):.1f}", e.get('timestamp', '')[:10]]
+        for cat, sessions in data.items()
+        for e in sessions
+    )
     table = Table(table_data, colWidths=[80, 180, 90, 90, 90])
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), rl_colors.lightblue),
-        ("GRID", (0,0), (-1,-1), 0.5, rl_colors.black),
-        ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
-    ]))
+    table.setStyle(_report_table_style())
     est_row_height = 18
     est_table_height = est_row_height * len(table_data)
     bottom_margin = 60
@@ -397,7 +1030,16 @@ def export_pdf():
     draw_y = y - est_table_height
     table.drawOn(c, 50, draw_y)
     c.save()
-    return send_file(tmp_path, as_attachment=True, download_name=filename)
+    buf.seek(0)
+    return buf
+
+def export_pdf():
+    # The cached snapshot is only read here, so no defensive copy is needed.
+    buf = _build_report_pdf(load_user_info(), _load_snapshot()[0])
+    resp = send_file(buf, mimetype='application/pdf', as_attachment=True, download_name='weekly_report.pdf')
+    # Personal and always current: never store it (send_file would default to no-cache).
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
 
 def healthz():
     """Lightweight health check endpoint for Kubernetes probes."""
@@ -413,13 +1055,136 @@ def register_routes(app: Flask) -> None:
     app.add_url_rule('/plan', 'plan', plan, methods=['GET'])
     app.add_url_rule('/diet', 'diet', diet, methods=['GET'])
     app.add_url_rule('/progress', 'progress', progress, methods=['GET'])
+    app.add_url_rule('/progress/chart.png', 'progress_chart', progress_chart, methods=['GET'])
     app.add_url_rule('/export', 'export_pdf', export_pdf, methods=['GET'])
     app.add_url_rule('/healthz', 'healthz', healthz, methods=['GET'])
 
 
+@functools.lru_cache(maxsize=64)
+def _content_hash(path: str, mtime_ns: int) -> str:
+    # mtime_ns is only part of the cache key: an edited file gets a fresh hash.
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()[:12]
+    except OSError:
+        return ''
+
+def _file_version(path: str) -> str:
+    """Short content hash of ``path``, recomputed only when its mtime changes."""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return ''
+    return _content_hash(path, mtime_ns)
+
+def _static_version(folder: str, filename: str) -> str:
+    """Short content hash for a static file, used to bust the long browser cache."""
+    return _file_version(os.path.join(folder, filename))
+
+def cache_fingerprinted_static(resp):
+    """after_request hook: long-lived caching for /static responses requested with ?v=.
+
+    A bare /static URL keeps Flask's default no-cache revalidation, since its
+    content can change under the same address.
+    """
+    if request.endpoint == 'static' and request.args.get('v') and resp.status_code in (200, 304):
+        resp.cache_control.no_cache = None
+        resp.cache_control.public = True
+        resp.cache_control.max_age = current_app.config['STATIC_MAX_AGE']
+    return resp
+
+def add_static_version(endpoint: str, values: dict) -> None:
+    """url_defaults hook: append ?v=<hash> to static URLs so they can be cached for a year."""
+    if endpoint == 'static' and 'filename' in values:
+        version = _static_version(current_app.static_folder, values['filename'])
+        if version:
+            values.setdefault('v', version)
+
+
+# --- Security & CSRF helpers ---
+def ensure_csrf_seed():  # pragma: no cover (simple session seeding)
+    """Force CSRF token generation on GET requests so the session cookie exists
+    before a user submits a form, reducing 'missing CSRF token' errors behind proxies."""
+    if request.method == 'GET':
+        # generate_csrf creates token & ensures session cookie; ignore return value.
+        try:
+            generate_csrf()
+        except Exception:  # pragma: no cover – defensive, should not occur
+            pass
+
+def secure_headers(resp):  # pragma: no cover (header setting)
+    resp.headers.setdefault('X-Content-Type-Options', 'nosniff')
+    # Views that opt into caching set Cache-Control themselves; leave those alone.
+    if 'Cache-Control' not in resp.headers:
+        resp.headers['Cache-Control'] = 'no-store'
+        resp.headers.setdefault('Pragma', 'no-cache')
+    return resp
+
+def handle_csrf_error(e):  # pragma: no cover (error path)
+    # Provide richer diagnostics in logs (never echo sensitive values to user)
+    try:
+        form_keys = list(request.form.keys())
+        has_token_field = 'csrf_token' in request.form
+        token_len = len(request.form.get('csrf_token', '')) if has_token_field else 0
+        current_app.logger.warning(
+            'CSRF failure: %s | token_field=%s token_len=%s form_keys=%s path=%s method=%s',
+            e.description,
+            has_token_field,
+            token_len,
+            form_keys,
+            request.path,
+            request.method,
+        )
+    except Exception:  # pragma: no cover - defensive logging
+        current_app.logger.warning('CSRF failure (diagnostic logging failed): %s', e.description)
+
+    # User-facing message kept generic to avoid leaking mechanics
+    flash('Your session security token was missing or expired. Please reload the page and try again.', 'error')
+    # Redirect to referrer if safe, else index, preserving UX flow
+    ref = request.headers.get('Referer')
+    return redirect(ref or url_for('index')), 400
+
+def register_security(app: Flask) -> None:
+    """Attach CSRF seeding, security headers and the CSRF error page to an app.
+
+    Done inside create_app so every instance (gunicorn's ``app:create_app()``,
+    tests, ``python app.py``) gets them, not just the module-level ``app``.
+    """
+    # Seeding only matters when tokens are checked; test/dev apps skip the per-GET hook.
+    if app.config['WTF_CSRF_ENABLED']:
+        app.before_request(ensure_csrf_seed)
+    app.after_request(secure_headers)
+    app.register_error_handler(CSRFError, handle_csrf_error)
+
+
+# Environment settings that change the compiled template code.
+_JINJA_CODEGEN_OPTIONS = (
+    'block_start_string', 'block_end_string', 'variable_start_string', 'variable_end_string',
+    'comment_start_string', 'comment_end_string', 'line_statement_prefix', 'line_comment_prefix',
+    'trim_blocks', 'lstrip_blocks', 'newline_sequence', 'keep_trailing_newline', 'optimized',
+)
+
+def _bytecode_cache_pattern(env) -> str:
+    """FileSystemBytecodeCache file pattern unique to ``env``'s codegen options.
+
+    Jinja keys cached bytecode on template name and source only, so an option
+    change would otherwise load code compiled under the old settings.
+    """
+    options = [getattr(env, name) for name in _JINJA_CODEGEN_OPTIONS]
+    key = repr((options, sorted(env.extensions)))
+    return f"__aceest_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}_%s.cache"
+
+
 def create_app(test_config: Optional[dict] = None) -> Flask:
     """Application factory with reduced cognitive complexity (<15)."""
     app = Flask(__name__)
+    # Drop the newline/indent around {% %} tags: fewer output nodes and smaller bodies.
+    # Must be set before the first app.jinja_env access, which builds the environment.
+    app.jinja_options = {**app.jinja_options, 'trim_blocks': True, 'lstrip_blocks': True}
+    if orjson is not None:
+        app.json = _OrjsonProvider(app)
+    # Emit keys in insertion order; sorting only costs time for these small payloads.
+    app.json.sort_keys = False
     testing = bool(test_config and test_config.get('TESTING')) or bool(os.getenv('PYTEST_CURRENT_TEST'))
     # Secret key resolved via helper; never hard-coded.
     app.config['SECRET_KEY'] = _get_global_secret(test_config, testing)  # NOSONAR env/ephemeral sourced + cached
@@ -439,12 +1204,26 @@ def create_app(test_config: Optional[dict] = None) -> Flask:
     default_user_path = os.path.join(os.path.dirname(__file__), 'user.json')
     env_user_path = os.getenv('USER_FILE')
     app.config.setdefault('USER_FILE', env_user_path if env_user_path else default_user_path)
+    # Seconds to buffer /log writes in memory before flushing (0 = write-through; single worker only).
+    app.config.setdefault('DATA_WRITE_BEHIND', float(os.getenv('DATA_WRITE_BEHIND', '0')))
+    # Fingerprinted static URLs (?v=<hash>) may be kept for a year; bare ones still revalidate.
+    app.config.setdefault('STATIC_MAX_AGE', 31536000)
+    # Sessions per category rendered on each /summary page.
+    app.config.setdefault('SUMMARY_PAGE_SIZE', int(os.getenv('SUMMARY_PAGE_SIZE', '100')))
     # If directory is not writable, attempt permissive warning so user sees flash message instead of silent failure.
     data_dir = os.path.dirname(app.config['DATA_FILE']) or '.'
     if not os.access(data_dir, os.W_OK):  # pragma: no cover (environment dependent)
         logger.warning(f"Data directory '{data_dir}' not writable for user; workout logs may fail to persist.")
     if test_config:
         app.config.update(test_config)
+    if _is_msgpack(app.config['DATA_FILE']) and msgpack is None:
+        raise RuntimeError(f"DATA_FILE '{app.config['DATA_FILE']}' needs the msgpack package (pip install msgpack).")
+    # The buffered snapshot would overwrite entries other workers appended in the meantime.
+    if app.config['DATA_WRITE_BEHIND'] > 0 and os.getenv('WEB_CONCURRENCY') != '1':
+        raise RuntimeError("DATA_WRITE_BEHIND needs a single worker process; run Gunicorn with "
+                           "--workers 1 and set WEB_CONCURRENCY=1 to enable it.")
+    if app.config['SUMMARY_PAGE_SIZE'] < 1:
+        raise RuntimeError(f"SUMMARY_PAGE_SIZE must be at least 1, got {app.config['SUMMARY_PAGE_SIZE']}.")
 
     # Ensure Matplotlib config directory writable (defensive runtime fix)
     mpl_dir = os.getenv('MPLCONFIGDIR')
@@ -454,11 +1233,30 @@ def create_app(test_config: Optional[dict] = None) -> Flask:
         except OSError as e:  # pragma: no cover
             logger.warning(f"Unable to create MPLCONFIGDIR '{mpl_dir}': {e}")
 
+    # Compress text bodies only; PDF and PNG payloads are already deflated internally.
+    app.config.setdefault('COMPRESS_MIMETYPES', ['text/html', 'text/css', 'application/json', 'image/svg+xml'])
+    app.config.setdefault('COMPRESS_ALGORITHM', ['br', 'gzip'])
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    # Tiny bodies (redirects, 304s, short errors) aren't worth a compression pass.
+    app.config.setdefault('COMPRESS_MIN_SIZE', 512)
+    if Compress is not None:
+        Compress(app)
+
     register_routes(app)
-    # Provide csrf_token helper for templates using manual forms
-    @app.context_processor
-    def inject_csrf():  # pragma: no cover simple helper
-        return {"csrf_token": generate_csrf}
+    register_security(app)
+    app.url_defaults(add_static_version)
+    app.after_request(cache_fingerprinted_static)
+    # Provide csrf_token helper for templates using manual forms (a Jinja global, so no
+    # per-render context processor; CSRFProtect sets the same global when enabled).
+    app.jinja_env.globals['csrf_token'] = generate_csrf
+    # Compile every template up front (bytecode shared across workers/restarts via the
+    # temp-dir cache) so the first request to each route doesn't pay for parsing.
+    # Bytecode keys don't cover environment options, so name the files after them.
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(pattern=_bytecode_cache_pattern(app.jinja_env))
+    for name in app.jinja_env.list_templates(extensions=('html',)):
+        app.jinja_env.get_template(name)
+    app.extensions['templates_version'] = _templates_version(app.jinja_env)
+    _prerender_static_pages(app)
     return app
 
 
@@ -477,47 +1275,3 @@ if __name__ == "__main__":
     # breaks CSRF session consistency and can trigger missing token errors.
     app.config['DEBUG'] = debug
     app.run(host=host, port=port, debug=debug)
-
-# --- Security & CSRF helpers (defined after final app instance) ---
-@app.before_request
-def ensure_csrf_seed():  # pragma: no cover (simple session seeding)
-    """Force CSRF token generation on GET requests so the session cookie exists
-    before a user submits a form, reducing 'missing CSRF token' errors behind proxies."""
-    if request.method == 'GET':
-        # generate_csrf creates token & ensures session cookie; ignore return value.
-        try:
-            generate_csrf()
-        except Exception:  # pragma: no cover – defensive, should not occur
-            pass
-
-@app.after_request
-def secure_headers(resp):  # pragma: no cover (header setting)
-    resp.headers.setdefault('X-Content-Type-Options', 'nosniff')
-    resp.headers.setdefault('Cache-Control', 'no-store')
-    resp.headers.setdefault('Pragma', 'no-cache')
-    return resp
-
-@app.errorhandler(CSRFError)
-def handle_csrf_error(e):  # pragma: no cover (error path)
-    # Provide richer diagnostics in logs (never echo sensitive values to user)
-    try:
-        form_keys = list(request.form.keys())
-        has_token_field = 'csrf_token' in request.form
-        token_len = len(request.form.get('csrf_token', '')) if has_token_field else 0
-        current_app.logger.warning(
-            'CSRF failure: %s | token_field=%s token_len=%s form_keys=%s path=%s method=%s',
-            e.description,
-            has_token_field,
-            token_len,
-            form_keys,
-            request.path,
-            request.method,
-        )
-    except Exception:  # pragma: no cover - defensive logging
-        current_app.logger.warning('CSRF failure (diagnostic logging failed): %s', e.description)
-
-    # User-facing message kept generic to avoid leaking mechanics
-    flash('Your session security token was missing or expired. Please reload the page and try again.', 'error')
-    # Redirect to referrer if safe, else index, preserving UX flow
-    ref = request.headers.get('Referer')
-    return redirect(ref or url_for('index')), 400
@@ -0,0 +1,50 @@
+import json
+import pytest
+from app import create_app
+
+@pytest.fixture()
+def data_file(tmp_path):
+    return str(tmp_path / "data.json")
+
+@pytest.fixture()
+def user_file(tmp_path):
+    return str(tmp_path / "user.json")
+
+@pytest.fixture(scope="session")
+def app_instance(tmp_path_factory):
+    # Built once per session; _isolate_files repoints it at fresh files for every test.
+    base = tmp_path_factory.mktemp("app")
+    return create_app({'TESTING': True, 'DATA_FILE': str(base / "data.json"), 'USER_FILE': str(base / "user.json")})
+
+@pytest.fixture(autouse=True)
+def _isolate_files(app_instance, data_file, user_file):
+    app_instance.config.update(DATA_FILE=data_file, USER_FILE=user_file)
+
+@pytest.fixture(scope="session")
+def _session_client(app_instance):
+    return app_instance.test_client()
+
+@pytest.fixture()
+def client(app_instance, _session_client):
+    # One client for the session; drop the session cookie so flashes never leak between tests.
+    _session_client.delete_cookie(app_instance.config['SESSION_COOKIE_NAME'])
+    return _session_client
+
+@pytest.fixture(scope="session")
+def client_stateless(app_instance):
+    # No cookie jar: for GET-only tests of pages that never touch the session.
+    return app_instance.test_client(use_cookies=False)
+
+@pytest.fixture()
+def seed(data_file):
+    # Write entries straight to DATA_FILE for tests that only need data present.
+    def _seed(entries):
+        data = {}
+        for category, exercise, minutes in entries:
+            data.setdefault(category, []).append({
+                'exercise': exercise, 'duration': int(minutes),
+                'calories': 0, 'timestamp': '2024-01-01 00:00:00',
+            })
+        with open(data_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    return _seed
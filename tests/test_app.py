@@ -1,30 +1,28 @@
-import os
+import re
 import json
+import datetime
+import multiprocessing
+import jinja2
+from pathlib import Path
 import pytest
+from flask import jsonify, render_template_string
+from flask.json.provider import DefaultJSONProvider
+import app as app_module
 from app import create_app
 
-@pytest.fixture()
-def data_file(tmp_path):
-    return str(tmp_path / "data.json")
-
-@pytest.fixture()
-def app_instance(data_file):
-    return create_app({'TESTING': True, 'DATA_FILE': data_file})
-
-@pytest.fixture()
-def client(app_instance):
-    return app_instance.test_client()
+_TOTAL_LOGGED = re.compile(r'Total Training Time Logged: \d+ minutes')
 
 def read_json(path):
-    if not os.path.exists(path):
+    try:
+        return json.loads(Path(path).read_bytes())
+    except FileNotFoundError:
         return None
-    with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
 
-def test_index_get(client, data_file):
-    resp = client.get('/')
+def test_index_get(client_stateless, data_file):
+    resp = client_stateless.get('/')
     assert resp.status_code == 200
     assert b'Log Workouts' in resp.data
+    assert b'<option value="Cool-down">Cool-down</option>' in resp.data
 
 def test_log_workout_success(client, data_file):
     resp = client.post('/log', data={
@@ -53,15 +51,15 @@ def test_log_workout_invalid_duration(client, data_file):
     if data:
         assert not any(e['exercise'] == 'Squats' for e in data['Workout'])
 
-def test_summary_empty(client, data_file):
-    resp = client.get('/summary')
+def test_summary_empty(client_stateless, data_file):
+    resp = client_stateless.get('/summary')
     assert resp.status_code == 200
     assert b'No sessions recorded.' in resp.data or b'No workouts logged yet.' in resp.data
 
-def test_progress_no_data(client, data_file):
-    resp = client.get('/progress')
+def test_progress_no_data(client_stateless, data_file):
+    resp = client_stateless.get('/progress')
     assert resp.status_code == 200
-    html = resp.data.decode('utf-8')
+    html = resp.get_data(as_text=True)
     # Allow either empty state or totals (if existing global data leaked)
     assert ('No workout data logged yet.' in html) or ('Total Training Time Logged:' in html)
 
@@ -71,15 +69,213 @@ def test_progress_with_data(client, data_file):
         'category': 'Warm-up',
         'exercise': 'Jumping Jacks',
         'duration': '5'
-    }, follow_redirects=True)
+    })
     resp = client.get('/progress')
     assert resp.status_code == 200
-    html = resp.data.decode('utf-8')
+    html = resp.get_data(as_text=True)
     # Should show total minutes (looser substring matching)
     assert 'Total Training Time Logged:' in html
     # Match any minutes value (digits) to be robust against prior persisted data
-    import re
-    assert re.search(r'Total Training Time Logged: \d+ minutes', html)
-    # Should embed chart image (base64 PNG)
-    assert 'data:image/png;base64' in html
+    assert _TOTAL_LOGGED.search(html)
+    # Should embed the chart inline as SVG by default
+    assert '<svg' in html
+    assert 'data:image/png;base64' not in html
+    # Raster chart still available on request, served from its own route
+    png_html = client.get('/progress?format=png').get_data(as_text=True)
+    assert 'src="/progress/chart.png"' in png_html
+
+def test_progress_chart_png_etag(client, data_file):
+    assert client.get('/progress/chart.png').status_code == 404
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Burpees', 'duration': '8'})
+    resp = client.get('/progress/chart.png')
+    assert resp.status_code == 200
+    assert resp.mimetype == 'image/png'
+    assert resp.data[:8] == b'\x89PNG\r\n\x1a\n'
+    etag = resp.headers['ETag']
+    assert resp.headers['Cache-Control'] == 'private, max-age=0, must-revalidate'
+    assert client.get('/progress/chart.png', headers={'If-None-Match': etag}).status_code == 304
+    # New data changes the ETag, so the stale validator gets a fresh image
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Burpees', 'duration': '2'})
+    assert client.get('/progress/chart.png', headers={'If-None-Match': etag}).status_code == 200
+
+def test_progress_page_etag(client, data_file):
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Burpees', 'duration': '8'})
+    # The pending flash is rendered on this view, so it must not be validated away
+    first = client.get('/progress')
+    assert b'Added Burpees' in first.data
+    assert 'ETag' not in first.headers
+    resp = client.get('/progress')
+    etag = resp.headers['ETag']
+    assert client.get('/progress', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/progress?format=png', headers={'If-None-Match': etag}).status_code == 200
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Burpees', 'duration': '2'})
+    assert client.get('/progress', headers={'If-None-Match': etag}).status_code == 200
+
+def test_progress_etag_changes_with_page_assets(app_instance, client, monkeypatch):
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Burpees', 'duration': '8'}, follow_redirects=True)
+    etag = client.get('/progress').headers['ETag']
+    assert client.get('/progress', headers={'If-None-Match': etag}).status_code == 304
+    # A deploy with new templates or a new stylesheet must not be answered from the old page
+    monkeypatch.setitem(app_instance.extensions, 'templates_version', 'deadbeef0000')
+    resp = client.get('/progress', headers={'If-None-Match': etag})
+    assert resp.status_code == 200
+    etag = resp.headers['ETag']
+    monkeypatch.setattr(app_module, '_static_version', lambda folder, filename: 'deadbeef0000')
+    resp = client.get('/progress', headers={'If-None-Match': etag})
+    assert resp.status_code == 200
+    assert resp.headers['ETag'] != etag
+
+def test_summary_reflects_external_data_file_edit(client, data_file):
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Rowing', 'duration': '7'})
+    assert b'Rowing' in client.get('/summary').data
+    # Rewrite the file behind the app's back; cached snapshot must be invalidated.
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump({'Warm-up': [], 'Workout': [{'exercise': 'Cycling', 'duration': 12, 'calories': 80.5, 'timestamp': '2025-01-01 10:00:00'}], 'Cool-down': []}, f)
+    html = client.get('/summary').get_data(as_text=True)
+    assert 'Cycling' in html
+    assert 'Rowing' not in html
+    assert 'Total Calories Burned:</strong> 80.5 kcal' in html
+
+@pytest.mark.parametrize('duration', ['abc', '-5', '1.5', '²', '000'])
+def test_log_workout_rejects_non_numeric_duration(client, data_file, duration):
+    resp = client.post('/log', data={
+        'category': 'Workout',
+        'exercise': 'Lunges',
+        'duration': duration,
+    }, follow_redirects=True)
+    assert resp.status_code == 200
+    assert b'Duration must be a positive whole number.' in resp.data
+    assert read_json(data_file) is None
+
+@pytest.mark.parametrize('duration', ['1441', '1000000', '9' * 5000])
+def test_log_workout_rejects_oversized_duration(client, data_file, duration):
+    resp = client.post('/log', data={'category': 'Workout', 'exercise': 'Lunges', 'duration': duration}, follow_redirects=True)
+    assert b'Duration too large (max 1440 minutes).' in resp.data
+    assert read_json(data_file) is None
+
+def test_log_workout_accepts_leading_zeros_up_to_limit(client, data_file):
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Hike', 'duration': '001440'})
+    assert read_json(data_file)['Workout'][0]['duration'] == 1440
+
+def test_log_workout_rejects_long_exercise_name(client, data_file):
+    resp = client.post('/log', data={'category': 'Workout', 'exercise': 'x' * 101, 'duration': '5'}, follow_redirects=True)
+    assert b'Exercise name too long (&gt;100).' in resp.data
+    assert read_json(data_file) is None
+
+def test_log_workout_invalid_category(client, data_file):
+    resp = client.post('/log', data={
+        'category': 'Stretching',
+        'exercise': 'Hamstrings',
+        'duration': '5',
+    }, follow_redirects=True)
+    assert b'Invalid category selected.' in resp.data
+    assert read_json(data_file) is None
+
+def test_msgpack_data_file_migrates_legacy_json(tmp_path):
+    msgpack = pytest.importorskip('msgpack')
+    legacy = tmp_path / 'data.json'
+    legacy.write_text(json.dumps({'Warm-up': [{'exercise': 'Skipping', 'duration': 4, 'timestamp': '2025-01-01 08:00:00'}], 'Workout': [], 'Cool-down': []}), encoding='utf-8')
+    packed = tmp_path / 'data.msgpack'
+    client = create_app({'TESTING': True, 'DATA_FILE': str(packed)}).test_client()
+    # Legacy JSON is read until the first save
+    assert b'Skipping' in client.get('/summary').data
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Deadlift', 'duration': '20'})
+    data = msgpack.unpackb(packed.read_bytes())
+    assert [e['exercise'] for e in data['Warm-up']] == ['Skipping']
+    assert [e['exercise'] for e in data['Workout']] == ['Deadlift']
+
+def test_jsonl_data_file_appends_one_line_per_log(tmp_path):
+    legacy = tmp_path / 'data.json'
+    legacy.write_text(json.dumps({'Warm-up': [{'exercise': 'Skipping', 'duration': 4, 'timestamp': '2025-01-01 08:00:00'}], 'Workout': [], 'Cool-down': []}), encoding='utf-8')
+    log = tmp_path / 'data.jsonl'
+    client = create_app({'TESTING': True, 'DATA_FILE': str(log)}).test_client()
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Deadlift', 'duration': '20'})
+    client.post('/log', data={'category': 'Cool-down', 'exercise': 'Stretch', 'duration': '5'})
+    lines = [json.loads(line) for line in log.read_text(encoding='utf-8').splitlines()]
+    assert [(r['cat'], r['exercise']) for r in lines] == [('Warm-up', 'Skipping'), ('Workout', 'Deadlift'), ('Cool-down', 'Stretch')]
+    # Records without a category and a torn trailing record (crash mid-append) must not
+    # hide the rest of the history
+    with open(log, 'ab') as f:
+        f.write(b'{"exercise":"NoCat","duration":3}\n5\n{"cat":"Workout","exerc')
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Rowing', 'duration': '9'})
+    html = client.get('/summary').get_data(as_text=True)
+    assert all(name in html for name in ('Skipping', 'Deadlift', 'Stretch', 'Rowing'))
+    assert 'NoCat' not in html
+
+class _IdleThread:
+    """Stands in for the write-behind flusher so no daemon thread outlives the test."""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def start(self):
+        pass
+
+    def is_alive(self):
+        return False
+
+def test_write_behind_requires_single_worker_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    with pytest.raises(RuntimeError, match='WEB_CONCURRENCY=1'):
+        create_app({'TESTING': True, 'DATA_FILE': str(tmp_path / 'data.json'), 'DATA_WRITE_BEHIND': 60})
+
+def test_write_behind_buffers_log_until_flush(tmp_path, monkeypatch):
+    monkeypatch.setenv('WEB_CONCURRENCY', '1')
+    # A live flusher would survive into later tests and could hold DATA_LOCK across a fork.
+    monkeypatch.setattr(app_module, 'Thread', _IdleThread)
+    monkeypatch.setattr(app_module, '_FLUSHER', None)
+    monkeypatch.setattr(app_module, '_PENDING', {})
+    path = tmp_path / 'data.json'
+    client = create_app({'TESTING': True, 'DATA_FILE': str(path), 'DATA_WRITE_BEHIND': 60}).test_client()
+    client.post('/log', data={'category': 'Workout', 'exercise': 'Plank', 'duration': '3'})
+    # Visible immediately to this worker, written to disk only on flush
+    assert b'Plank' in client.get('/summary').data
+    assert read_json(str(path)) is None
+    app_module._flush_pending()
+    assert [e['exercise'] for e in read_json(str(path))['Workout']] == ['Plank']
+
+def _log_from_worker(data_file, worker, count):
+    client = create_app({'TESTING': True, 'DATA_FILE': data_file}).test_client()
+    for i in range(count):
+        client.post('/log', data={'category': 'Workout', 'exercise': f'w{worker}-{i}', 'duration': '1'})
+
+def test_concurrent_workers_do_not_lose_entries(data_file):
+    pytest.importorskip('fcntl')
+    ctx = multiprocessing.get_context('fork')
+    procs = [ctx.Process(target=_log_from_worker, args=(data_file, w, 10)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    assert len(read_json(data_file)['Workout']) == 40
+
+def test_json_provider_matches_flask_default(app_instance, monkeypatch):
+    orjson = pytest.importorskip('orjson')
+    calls = []
+    real_dumps = orjson.dumps
+    monkeypatch.setattr(orjson, 'dumps', lambda *a, **k: calls.append(1) or real_dumps(*a, **k))
+    payload = {'b': 1, 'a': datetime.date(2025, 1, 2), 'c': [1.5, None]}
+    stdlib = DefaultJSONProvider(app_instance)
+    with app_instance.test_request_context():
+        resp = jsonify(payload)
+        assert len(calls) == 1, 'jsonify fell back to the stdlib encoder'
+        rendered = render_template_string('{{ payload|tojson }}', payload=payload)
+        assert len(calls) == 2, 'tojson fell back to the stdlib encoder'
+        expected = stdlib.response(payload)
+    assert resp.mimetype == 'application/json'
+    assert json.loads(resp.get_data()) == json.loads(expected.get_data())
+    assert json.loads(rendered) == json.loads(stdlib.dumps(payload))
+
+@pytest.mark.parametrize('args,kwargs', [((1, 2), {}), ((), {'a': 1}), (({'b': [1, None]},), {}), ((), {})])
+def test_jsonify_argument_forms_match_flask_default(app_instance, args, kwargs):
+    pytest.importorskip('orjson')
+    stdlib = DefaultJSONProvider(app_instance)
+    stdlib.sort_keys = app_instance.json.sort_keys
+    with app_instance.test_request_context():
+        assert jsonify(*args, **kwargs).get_data() == stdlib.response(*args, **kwargs).get_data()
 
+def test_bytecode_cache_pattern_tracks_jinja_options(app_instance):
+    env = app_instance.jinja_env
+    assert env.trim_blocks and env.lstrip_blocks
+    assert env.bytecode_cache.pattern == app_module._bytecode_cache_pattern(env)
+    plain = jinja2.Environment()
+    assert app_module._bytecode_cache_pattern(plain) != env.bytecode_cache.pattern
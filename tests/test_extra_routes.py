@@ -1,60 +1,56 @@
-import json
+import os
 import re
 import pytest
+import app as app_module
 from app import create_app
 
-@pytest.fixture()
-def data_file(tmp_path):
-    return str(tmp_path / "data.json")
+_WARMUP_TOTAL = re.compile(r'Warm-up:</strong>\s*(\d+) min')
+_STYLE_HREF = re.compile(r'href="(/static/style\.css\?v=[0-9a-f]{12})"')
 
-@pytest.fixture()
-def app_instance(data_file):
-    return create_app({'TESTING': True, 'DATA_FILE': data_file})
-
-@pytest.fixture()
-def client(app_instance):
-    return app_instance.test_client()
-
-def read_json(path):
-    try:
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return None
-
-def test_plan_route(client):
-    resp = client.get('/plan')
+@pytest.mark.parametrize('url,needles', [
+    ('/plan', [b'Personalized Workout Plan', b'Jumping Jacks (30 reps)']),
+    ('/diet', [b'Diet Guide for Fitness Goals', b'Oatmeal with Berries']),
+])
+def test_static_pages(client_stateless, url, needles):
+    resp = client_stateless.get(url)
     assert resp.status_code == 200
-    # Check presence of a known exercise string
-    assert b'Jumping Jacks (30 reps)' in resp.data
+    assert all(n in resp.data for n in needles)
 
-def test_diet_route(client):
-    resp = client.get('/diet')
-    assert resp.status_code == 200
-    # Check presence of a known diet item
-    assert b'Oatmeal with Berries' in resp.data
+def test_static_pages_revalidate_with_etag(client_stateless):
+    for url in ('/plan', '/diet'):
+        resp = client_stateless.get(url)
+        assert resp.status_code == 200
+        etag = resp.headers['ETag']
+        cached = client_stateless.get(url, headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+
+def test_revalidation_accepts_compressed_etags(client_stateless, seed):
+    # Flask-Compress rewrites the ETag to "<hash>:gzip"; browsers send that form back.
+    pytest.importorskip('flask_compress')
+    seed([('Workout', 'Rowing', 12)])
+    for url in ('/plan', '/diet', '/progress'):
+        resp = client_stateless.get(url, headers={'Accept-Encoding': 'gzip'})
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        etag = resp.headers['ETag']
+        assert etag.endswith(':gzip"')
+        cached = client_stateless.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.headers['ETag'] == etag
 
-def test_summary_after_multiple_logs(client, data_file):
-    client.post('/log', data={'category': 'Warm-up', 'exercise': 'Jog', 'duration': '5'})
-    client.post('/log', data={'category': 'Workout', 'exercise': 'Push-ups', 'duration': '10'})
-    client.post('/log', data={'category': 'Cool-down', 'exercise': 'Stretch', 'duration': '3'})
-    resp = client.get('/summary')
+def test_summary_after_multiple_logs(client_stateless, seed):
+    seed([('Warm-up', 'Jog', 5), ('Workout', 'Push-ups', 10), ('Cool-down', 'Stretch', 3)])
+    resp = client_stateless.get('/summary')
     assert resp.status_code == 200
-    html = resp.data.decode('utf-8')
-    data = read_json(data_file)
-    assert data is not None
-    # Ensure each category has at least one entry logged
-    assert any(e['exercise'] == 'Jog' for e in data['Warm-up'])
-    assert any(e['exercise'] == 'Push-ups' for e in data['Workout'])
-    assert any(e['exercise'] == 'Stretch' for e in data['Cool-down'])
-    # Verify summary page contains category headings
-    for heading in ['Warm-up', 'Workout', 'Cool-down', 'Total Time Spent']:
-        assert heading in html
+    html = resp.get_data(as_text=True)
+    # Verify summary page contains category headings and each seeded exercise
+    for needle in ['Warm-up', 'Workout', 'Cool-down', 'Total Time Spent', 'Jog', 'Push-ups', 'Stretch']:
+        assert needle in html
 
-def test_progress_empty_state(client, data_file):
+def test_progress_empty_state(client_stateless, data_file):
     # No logs -> expect empty message
-    resp = client.get('/progress')
-    html = resp.data.decode('utf-8')
+    resp = client_stateless.get('/progress')
+    html = resp.get_data(as_text=True)
     # Depending on external data file leakage, page may show totals or empty message
     assert ('No workout data logged yet.' in html) or ('Total Training Time Logged:' in html)
 
@@ -62,10 +58,54 @@ def test_progress_after_logs(client, data_file):
     client.post('/log', data={'category': 'Warm-up', 'exercise': 'Jump Rope', 'duration': '4'})
     client.post('/log', data={'category': 'Warm-up', 'exercise': 'Arm Circles', 'duration': '2'})
     resp = client.get('/progress')
-    html = resp.data.decode('utf-8')
+    html = resp.get_data(as_text=True)
     # Should show at least total training time string
     assert 'Total Training Time Logged:' in html
     # Warm-up total should be >= 6 minutes (if pre-existing data was present)
-    warmup_match = re.search(r'Warm-up:</strong>\s*(\d+) min', html)
+    warmup_match = _WARMUP_TOTAL.search(html)
     assert warmup_match, 'Warm-up total not found in progress page'
     assert int(warmup_match.group(1)) >= 6
+
+def test_factory_app_sets_security_headers(client_stateless):
+    # Every create_app() instance (as run by gunicorn) gets the header hook, not just the module app
+    resp = client_stateless.get('/summary')
+    assert resp.headers['X-Content-Type-Options'] == 'nosniff'
+    assert resp.headers['Cache-Control'] == 'no-store'
+
+def test_summary_paginates_newest_first(data_file):
+    client = create_app({'TESTING': True, 'DATA_FILE': data_file, 'SUMMARY_PAGE_SIZE': 2}).test_client()
+    for name in ('Squats', 'Lunges', 'Burpees'):
+        client.post('/log', data={'category': 'Workout', 'exercise': name, 'duration': '5'}, follow_redirects=True)
+    first = client.get('/summary').get_data(as_text=True)
+    assert 'Lunges' in first and 'Burpees' in first and 'Squats' not in first
+    assert 'Page 1 of 2' in first
+    assert '15 minutes' in first  # totals still cover every session
+    older = client.get('/summary?page=2').get_data(as_text=True)
+    assert 'Squats' in older and 'Burpees' not in older
+    assert '<ol class="session-list" start="1">' in older
+
+@pytest.mark.parametrize('size', [0, -3])
+def test_summary_page_size_must_be_positive(data_file, size):
+    with pytest.raises(RuntimeError, match='SUMMARY_PAGE_SIZE'):
+        create_app({'TESTING': True, 'DATA_FILE': data_file, 'SUMMARY_PAGE_SIZE': size})
+
+def test_static_css_is_fingerprinted_and_long_cached(client_stateless):
+    html = client_stateless.get('/').get_data(as_text=True)
+    href = _STYLE_HREF.search(html).group(1)
+    resp = client_stateless.get(href)
+    assert resp.status_code == 200
+    assert 'max-age=31536000' in resp.headers['Cache-Control']
+    # Without the fingerprint the same file must still revalidate
+    bare = client_stateless.get('/static/style.css')
+    assert bare.status_code == 200
+    assert 'max-age=31536000' not in bare.headers['Cache-Control']
+    assert 'no-cache' in bare.headers['Cache-Control']
+
+def test_static_version_follows_file_edits(tmp_path):
+    css = tmp_path / 'style.css'
+    css.write_text('body { color: red; }')
+    before = app_module._static_version(str(tmp_path), 'style.css')
+    css.write_text('body { color: blue; }')
+    # Coarse filesystem clocks can give the rewrite the same mtime; force a new one.
+    os.utime(css, ns=(0, css.stat().st_mtime_ns + 1_000_000))
+    assert app_module._static_version(str(tmp_path), 'style.css') != before
@@ -1,27 +1,33 @@
+import os
 import re
 import io
-from app import create_app
 import pytest
+import app as app_module
 
-@pytest.fixture()
-def data_file(tmp_path):
-    return str(tmp_path / "data.json")
+_PUSHUPS_ROW = re.compile(r'Push-ups</strong> - 10 min / .* kcal')
+_ALICE = {'name': 'Alice', 'regn_id': 'REG123', 'age': '28', 'gender': 'F', 'height': '165', 'weight': '60'}
 
-@pytest.fixture()
-def user_file(tmp_path):
-    return str(tmp_path / "user.json")
+@pytest.fixture(scope="session")
+def _saved_user_bytes(app_instance, tmp_path_factory):
+    # Save the profile through the real route once, then replay the file per test.
+    path = str(tmp_path_factory.mktemp("user") / "user.json")
+    previous = app_instance.config['USER_FILE']
+    app_instance.config['USER_FILE'] = path
+    try:
+        app_instance.test_client().post('/user/save', data=_ALICE)
+    finally:
+        app_instance.config['USER_FILE'] = previous
+    with open(path, 'rb') as f:
+        return f.read()
 
 @pytest.fixture()
-def app_instance(data_file, user_file):
-    # TESTING disables CSRF, easier form posts
-    return create_app({'TESTING': True, 'DATA_FILE': data_file, 'USER_FILE': user_file})
+def saved_user(_saved_user_bytes, user_file):
+    with open(user_file, 'wb') as f:
+        f.write(_saved_user_bytes)
+    return _ALICE
 
-@pytest.fixture()
-def client(app_instance):
-    return app_instance.test_client()
-
-def test_user_get_empty(client):
-    resp = client.get('/user')
+def test_user_get_empty(client_stateless):
+    resp = client_stateless.get('/user')
     assert resp.status_code == 200
     # Heading from user.html
     assert b'User Information' in resp.data
@@ -32,43 +38,50 @@ def test_user_save_invalid(client):
         'name': 'Test', 'regn_id': 'R1', 'age': '30', 'gender': 'X', 'height': '10', 'weight': '10'
     }, follow_redirects=True)
     assert resp.status_code == 200
-    body = resp.data.decode('utf-8')
+    body = resp.get_data(as_text=True)
     assert 'Gender must be M or F.' in body
     assert 'Height out of range' in body
 
 def test_user_save_success(client):
-    resp = client.post('/user/save', data={
-        'name': 'Alice', 'regn_id': 'REG123', 'age': '28', 'gender': 'F', 'height': '165', 'weight': '60'
-    }, follow_redirects=True)
+    resp = client.post('/user/save', data=_ALICE, follow_redirects=True)
     assert resp.status_code == 200
-    body = resp.data.decode('utf-8')
+    body = resp.get_data(as_text=True)
     assert 'User info saved! BMI=' in body
-    # subsequent GET should include BMI line
-    get_resp = client.get('/user')
+
+def test_user_get_saved(client_stateless, saved_user):
+    get_resp = client_stateless.get('/user')
     assert get_resp.status_code == 200
-    assert 'BMI:' in get_resp.data.decode('utf-8')
+    body = get_resp.get_data(as_text=True)
+    assert 'BMI:' in body
+    assert saved_user['name'] in body
 
-def test_log_workout_with_user(client):
+def test_log_workout_with_user(client, saved_user):
     # Ensure calories included after user saved
-    client.post('/user/save', data={
-        'name': 'Bob', 'regn_id': 'X1', 'age': '35', 'gender': 'M', 'height': '180', 'weight': '80'
-    })
     resp = client.post('/log', data={'category': 'Workout', 'exercise': 'Push-ups', 'duration': '10'}, follow_redirects=True)
     assert resp.status_code == 200
     # Check flash presence
     assert b'Added Push-ups (10 min) to Workout!' in resp.data
     summary = client.get('/summary')
     assert summary.status_code == 200
-    html = summary.data.decode('utf-8')
+    html = summary.get_data(as_text=True)
     assert 'Push-ups' in html
-    assert re.search(r'Push-ups</strong> - 10 min / .* kcal', html)
+    assert _PUSHUPS_ROW.search(html)
 
-def test_export_pdf(client):
-    # Add a workout to ensure table has at least one row
+def test_export_pdf(app_instance, client):
+    # The one test that renders a real report through ReportLab
     client.post('/log', data={'category': 'Warm-up', 'exercise': 'Jumping Jacks', 'duration': '5'})
-    pdf_resp = client.get('/export')
-    assert pdf_resp.status_code == 200
-    assert pdf_resp.headers.get('Content-Type', '').startswith('application/pdf')
-    # First few bytes of PDF
-    start = pdf_resp.data[:4]
-    assert start == b'%PDF'
+    # Unbuffered: only the first chunk is read for the magic-bytes check
+    with client.get('/export', buffered=False) as pdf_resp:
+        assert pdf_resp.status_code == 200
+        assert next(iter(pdf_resp.response))[:4] == b'%PDF'
+    # Built in memory, never written to the instance folder
+    assert not os.path.exists(os.path.join(app_instance.instance_path, 'weekly_report.pdf'))
+
+def test_export_pdf_headers(client, monkeypatch):
+    monkeypatch.setattr(app_module, '_build_report_pdf', lambda user, data: io.BytesIO(b'%PDF-1.4\n%stub'))
+    resp = client.get('/export')
+    assert resp.status_code == 200
+    assert resp.mimetype == 'application/pdf'
+    assert resp.data == b'%PDF-1.4\n%stub'
+    assert 'attachment; filename=weekly_report.pdf' in resp.headers['Content-Disposition']
+    assert resp.headers['Cache-Control'] == 'no-store'